@@ -1,12 +1,39 @@
-from flask import Flask, render_template, request, redirect, session
+from flask import Flask, render_template, request, redirect, session, jsonify, Response, url_for, stream_with_context
 import sqlite3
 import os
-from datetime import datetime, timedelta
+import atexit
+import cProfile
+import csv
+import io
+import json
+import heapq
+import math
+import logging
+import queue
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from urllib.parse import parse_qs
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+from werkzeug.wsgi import ClosingIterator
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+
 app = Flask(__name__)
-app.secret_key = "stree_secret_key"
+app.secret_key = os.environ.get('STREE_SECRET_KEY', "stree_secret_key")
 
 # ------------------ FILE UPLOAD CONFIG ------------------
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
@@ -22,6 +49,40 @@ def allowed_file(filename):
 
 
 # ------------------ DATABASE INIT ------------------
+ISO_DATE_GLOB = '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+
+
+def normalise_legacy_dates(cursor):
+    """
+    Rewrites cycle_logs dates that aren't zero-padded YYYY-MM-DD. The tracker
+    used to store the raw form value, which strptime accepted as e.g. 2025-3-1.
+    Rewritten rows get a new version so offline clients pick up the change.
+    """
+    cursor.execute(f"""
+        SELECT id, start_date, end_date FROM cycle_logs
+        WHERE start_date NOT GLOB '{ISO_DATE_GLOB}'
+           OR (end_date IS NOT NULL AND end_date != '' AND end_date NOT GLOB '{ISO_DATE_GLOB}')
+    """)
+    for log_id, start_date, end_date in cursor.fetchall():
+        normalised = []
+        for value in (start_date, end_date):
+            if not value:
+                normalised.append(value)
+                continue
+            try:
+                normalised.append(datetime.strptime(value, '%Y-%m-%d').date().isoformat())
+            except ValueError:
+                try:
+                    normalised.append(date.fromisoformat(value).isoformat())
+                except ValueError:
+                    normalised.append(value)    # unreadable either way; leave it for a human
+        cursor.execute("""
+            UPDATE cycle_logs
+            SET start_date = ?, end_date = ?, version = (SELECT COALESCE(MAX(version), 0) + 1 FROM cycle_logs)
+            WHERE id = ?
+        """, (normalised[0], normalised[1], log_id))
+
+
 def init_db():
     conn = sqlite3.connect("stree.db")
     cursor = conn.cursor()
@@ -45,9 +106,52 @@ def init_db():
             cycle_length INTEGER,
             period_length INTEGER,
             symptoms TEXT,
+            version INTEGER,
+            client_id TEXT,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    """)
+
+    # Older databases predate offline sync: add its columns and give existing rows a version
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(cycle_logs)")}
+    if 'version' not in columns:
+        cursor.execute("ALTER TABLE cycle_logs ADD COLUMN version INTEGER")
+        cursor.execute("UPDATE cycle_logs SET version = id")
+    if 'client_id' not in columns:
+        cursor.execute("ALTER TABLE cycle_logs ADD COLUMN client_id TEXT")
+
+    normalise_legacy_dates(cursor)
+
+    # Every new row gets the next version number, whichever code path inserted it
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS cycle_logs_version AFTER INSERT ON cycle_logs
+        BEGIN
+            UPDATE cycle_logs SET version = (SELECT COALESCE(MAX(version), 0) + 1 FROM cycle_logs)
+            WHERE id = NEW.id;
+        END
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cycle_logs_version ON cycle_logs(user_id, version)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cycle_logs_version_all ON cycle_logs(version)")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            data TEXT,
+            expires_at REAL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS reminders (
+            user_id INTEGER,
+            kind TEXT,
+            due_at TEXT,
+            event_date TEXT,
+            PRIMARY KEY(user_id, kind),
             FOREIGN KEY(user_id) REFERENCES users(id)
         )
     """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reminders_due_at ON reminders(due_at)")
 
     conn.commit()
     conn.close()
@@ -55,6 +159,289 @@ def init_db():
 init_db()
 
 
+# ------------------ SESSION STORE ------------------
+class ServerSession(CallbackDict, SessionMixin):
+    """Session whose contents live on the server; the cookie only holds `sid`."""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.rotate = False
+
+    def regenerate(self):
+        """Issue a fresh session id on the next response (e.g. after login)."""
+        self.rotate = True
+        self.modified = True
+
+
+class SQLiteSessionStore:
+    """
+    Session backend storing serialized session data in the sessions table.
+    Any object with the same load/save/touch/delete methods can replace it.
+    """
+
+    def __init__(self, db_path="stree.db", purge_interval=3600):
+        self.db_path = db_path
+        self.purge_interval = purge_interval
+        self._last_purge = 0
+
+    def load(self, sid):
+        """Returns (data, expires_at) or None. Expired rows are deleted on sight."""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute("SELECT data, expires_at FROM sessions WHERE id = ?", (sid,)).fetchone()
+        if row and row[1] < time.time():
+            conn.execute("DELETE FROM sessions WHERE id = ?", (sid,))
+            conn.commit()
+            row = None
+        conn.close()
+        return row
+
+    def save(self, sid, data, expires_at):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+                     (sid, data, expires_at))
+        # Sessions nobody comes back for are never read again, so sweep them now and then
+        if time.time() - self._last_purge > self.purge_interval:
+            self._last_purge = time.time()
+            conn.execute("DELETE FROM sessions WHERE expires_at < ?", (self._last_purge,))
+        conn.commit()
+        conn.close()
+
+    def touch(self, sid, expires_at):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE sessions SET expires_at = ? WHERE id = ?", (expires_at, sid))
+        conn.commit()
+        conn.close()
+
+    def delete(self, sid):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM sessions WHERE id = ?", (sid,))
+        conn.commit()
+        conn.close()
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Flask session interface backed by a server-side store with a per-worker
+    LRU cache in front of it. The cookie carries only an opaque random id and
+    is set once per session, not re-signed on every response.
+
+    Sessions expire PERMANENT_SESSION_LIFETIME after their last use. Expiry is
+    lazy: it is checked when a session is read, and an unchanged session's
+    expiry is only pushed back every `touch_interval` seconds. Cache entries
+    are trusted for `cache_ttl` seconds, which bounds how long another worker
+    can keep serving a session this one has changed or ended.
+    """
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store, cache_size=1024, cache_ttl=5, touch_interval=3600):
+        self.store = store
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.touch_interval = touch_interval
+        self._cache = OrderedDict()     # sid -> (serialized data, expires_at, cached_at)
+        self._lock = threading.Lock()
+
+    def _cache_get(self, sid):
+        with self._lock:
+            entry = self._cache.get(sid)
+            if entry is None:
+                return None
+            if time.time() - entry[2] > self.cache_ttl or entry[1] < time.time():
+                del self._cache[sid]
+                return None
+            self._cache.move_to_end(sid)
+            return entry
+
+    def _cache_put(self, sid, data, expires_at):
+        with self._lock:
+            self._cache[sid] = (data, expires_at, time.time())
+            self._cache.move_to_end(sid)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_drop(self, sid):
+        with self._lock:
+            self._cache.pop(sid, None)
+
+    def _lifetime(self, app):
+        return app.permanent_session_lifetime.total_seconds()
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            entry = self._cache_get(sid)
+            if entry is None:
+                row = self.store.load(sid)
+                if row is not None:
+                    self._cache_put(sid, row[0], row[1])
+                    entry = (row[0], row[1])
+            if entry is not None:
+                return ServerSession(self.serializer.loads(entry[0]), sid=sid)
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            # Emptied (logout) or never used: drop the server copy and the cookie
+            if not session.new:
+                self.store.delete(session.sid)
+                self._cache_drop(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.rotate:
+            self.store.delete(session.sid)
+            self._cache_drop(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+            session.new = True
+
+        data = self.serializer.dumps(dict(session))
+        now = time.time()
+        expires_at = now + self._lifetime(app)
+        cached = self._cache_get(session.sid)
+
+        if session.new or cached is None or cached[0] != data:
+            # Writes that don't change anything (e.g. re-setting 'living') skip the store
+            self.store.save(session.sid, data, expires_at)
+            self._cache_put(session.sid, data, expires_at)
+        elif cached[1] - now < self._lifetime(app) - self.touch_interval:
+            self.store.touch(session.sid, expires_at)
+            self._cache_put(session.sid, data, expires_at)
+
+        if session.new:
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+                partitioned=self.get_cookie_partitioned(app),
+            )
+
+
+app.session_interface = ServerSideSessionInterface(SQLiteSessionStore())
+
+
+# ------------------ CYCLE LOG MODELS ------------------
+CYCLE_LOG_COLUMNS = "id, user_id, start_date, end_date, cycle_length, period_length, symptoms, version, client_id"
+
+
+def parse_date(value):
+    """Parses a stored YYYY-MM-DD string into a date (None stays None)."""
+    return date.fromisoformat(value) if value else None
+
+
+def parse_form_date(value):
+    """
+    Parses a submitted date. Stricter than parse_date: fromisoformat would
+    also take forms like 20250226 or 2025-W14-1, which must not be stored.
+    """
+    if not isinstance(value, str):
+        raise ValueError("Dates must be strings in YYYY-MM-DD format.")
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"{value!r} is not a valid date in YYYY-MM-DD format.") from None
+
+
+class CycleLog:
+    """One cycle_logs row, with its dates parsed once when it is fetched."""
+    __slots__ = ('id', 'user_id', 'start_date', 'end_date',
+                 'cycle_length', 'period_length', 'symptoms', 'version', 'client_id')
+
+    def __init__(self, id, user_id, start_date, end_date, cycle_length, period_length, symptoms,
+                 version=None, client_id=None):
+        self.id = id
+        self.user_id = user_id
+        self.start_date = parse_date(start_date)
+        self.end_date = parse_date(end_date)
+        self.cycle_length = cycle_length
+        self.period_length = period_length
+        self.symptoms = symptoms
+        self.version = version
+        self.client_id = client_id
+
+    def is_irregular(self):
+        return self.cycle_length is not None and (self.cycle_length > 35 or self.cycle_length < 21)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "start_date": self.start_date.isoformat(),
+            "end_date": self.end_date.isoformat() if self.end_date else None,
+            "cycle_length": self.cycle_length,
+            "period_length": self.period_length,
+            "symptoms": self.symptoms,
+            "version": self.version,
+            "client_id": self.client_id,
+        }
+
+
+def cycle_log_factory(cursor, row):
+    """sqlite3 row_factory for queries selecting CYCLE_LOG_COLUMNS."""
+    return CycleLog(*row)
+
+
+class CycleHistory:
+    """
+    Column-oriented view of a user's logs, oldest first.
+    Keeps start dates and cycle lengths in parallel lists so the
+    prediction and chart code never walk the row objects again.
+    """
+    __slots__ = ('logs', 'start_dates', 'cycle_lengths')
+
+    def __init__(self, logs):
+        logs = list(logs)
+        # Rows normally arrive ordered by start_date; only sort if they don't
+        if any(a.start_date > b.start_date for a, b in zip(logs, logs[1:])):
+            logs.sort(key=lambda log: log.start_date)
+        self.logs = logs
+        self.start_dates = [log.start_date for log in logs]
+        self.cycle_lengths = [log.cycle_length for log in logs]
+
+    def __len__(self):
+        return len(self.logs)
+
+    def valid_cycle_lengths(self):
+        return [length for length in self.cycle_lengths if length is not None and length > 0]
+
+    def latest_start(self):
+        return self.start_dates[-1] if self.start_dates else None
+
+    def chart_series(self, last_n=6):
+        """Month labels and cycle lengths for the last `last_n` logs that have a length."""
+        labels = []
+        data = []
+        for start, length in zip(self.start_dates[-last_n:], self.cycle_lengths[-last_n:]):
+            if length:
+                labels.append(start.strftime('%b'))
+                data.append(length)
+        return labels, data
+
+    def newest_first(self):
+        return self.logs[::-1]
+
+
+def load_cycle_history(conn, user_id):
+    """Fetches all of a user's logs as a CycleHistory."""
+    cursor = conn.cursor()
+    cursor.row_factory = cycle_log_factory
+    cursor.execute(f"SELECT {CYCLE_LOG_COLUMNS} FROM cycle_logs WHERE user_id = ? ORDER BY start_date ASC", (user_id,))
+    return CycleHistory(cursor.fetchall())
+
+
 # ------------------ ROOT ------------------
 @app.route('/')
 def index():
@@ -106,6 +493,7 @@ def login():
         conn.close()
 
         if user and check_password_hash(user[4], password):
+            session.regenerate()
             session['user'] = user[1]
             session['email'] = user[3]
             return redirect('/dashboard')
@@ -124,6 +512,9 @@ def dashboard():
 
 
 # ------------------ PCOS ANALYZER ------------------
+EXERCISE_MINUTES = [15, 30, 45, 60, 90]
+
+
 def get_exercise_plan(risk_level, exercise_minutes, living):
     """
     Returns a personalized exercise plan list based on:
@@ -188,8 +579,7 @@ def get_exercise_plan(risk_level, exercise_minutes, living):
     }
 
     # Normalise minutes to nearest key
-    time_keys = [15, 30, 45, 60, 90]
-    closest = min(time_keys, key=lambda k: abs(k - minutes))
+    closest = min(EXERCISE_MINUTES, key=lambda k: abs(k - minutes))
 
     exercises = (hostel_exercises if living == 'hostel' else home_exercises).get(closest, [])
 
@@ -342,6 +732,199 @@ def get_diet_chart(risk_level, living):
     return meals, avoid, diet_tip_map[risk_level]
 
 
+# ------------------ PCOS SCORING ENGINE ------------------
+# Weight applied to each symptom answer (form values: 0=No, 1=Sometimes, 2=Yes).
+# Primary symptoms are weighted heavier.
+PCOS_WEIGHTS = {
+    'irregular':      2,
+    'acne':           0.5,
+    'hair_growth':    1.5,
+    'weight_gain':    0.5,
+    'family_history': 1,
+}
+
+# (upper BMI bound, category, score)
+BMI_BANDS = [
+    (18.5,         "Underweight",    0),
+    (25,           "Healthy Weight", 0),
+    (30,           "Overweight",     1),
+    (float('inf'), "Obese",          2),
+]
+
+# (upper percentage bound, risk class, result text)
+RISK_BANDS = [
+    (35,           "low",    "Low Risk of PCOS / PCOD 🌿"),
+    (65,           "medium", "Moderate Risk of PCOS / PCOD ⚠️"),
+    (float('inf'), "high",   "High Risk of PCOS / PCOD 🚨 Please Consult a Doctor"),
+]
+
+
+def finite_float(value):
+    """float() that also rejects NaN and infinity."""
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{value!r} is not a finite number")
+    return number
+
+
+def symptom_answer(value):
+    """int() for a 0/1/2 answer that refuses bools and fractions like 1.5 instead of truncating them."""
+    if isinstance(value, bool):
+        raise TypeError("answer must be a number")
+    if isinstance(value, int):
+        return value
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"{value!r} is not a whole number")
+    return int(number)
+
+
+class PCOSScorer:
+    """
+    Scores PCOS questionnaire answers against a weight table.
+    Used by the /pcos form (one participant) and the batch API
+    (many participants, scored column by column).
+    """
+
+    def __init__(self, weights=None, bmi_bands=BMI_BANDS, risk_bands=RISK_BANDS):
+        self.weights = dict(PCOS_WEIGHTS)
+        if weights is not None:
+            if not isinstance(weights, dict):
+                raise ValueError("'weights' must be an object mapping symptom names to numbers")
+            unknown = set(weights) - set(PCOS_WEIGHTS)
+            if unknown:
+                raise ValueError(f"Unknown weight(s): {', '.join(sorted(unknown))}")
+            for name, value in weights.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+                    raise ValueError(f"Weight '{name}' must be a number")
+                value = finite_float(value)
+                if value < 0:
+                    raise ValueError(f"Weight '{name}' cannot be negative")
+                self.weights[name] = value
+        self.bmi_bands = bmi_bands
+        self.risk_bands = risk_bands
+        self.max_score = sum(w * 2 for w in self.weights.values()) + max(b[2] for b in bmi_bands)
+        if not math.isfinite(self.max_score):
+            raise ValueError("Weights are too large")
+        # Answer -> weighted points, looked up instead of multiplied per row
+        self._points = {name: (0, w, w * 2) for name, w in self.weights.items()}
+
+    def bmi(self, height_cm, weight_kg):
+        height_m = height_cm / 100
+        bmi = round(weight_kg / (height_m ** 2), 1)
+        for upper, category, points in self.bmi_bands:
+            if bmi < upper:
+                return bmi, category, points
+        return bmi, self.bmi_bands[-1][1], self.bmi_bands[-1][2]
+
+    def risk(self, percentage):
+        for upper, risk_class, result in self.risk_bands:
+            if percentage < upper:
+                return risk_class, result
+        return self.risk_bands[-1][1], self.risk_bands[-1][2]
+
+    def score(self, answers):
+        """Scores a single participant. `answers` maps symptom name -> 0/1/2, plus height and weight."""
+        return next(self.score_batch([answers]))
+
+    def score_batch(self, rows, chunk_size=500):
+        """
+        Yields one result dict per input row, in order. Rows are scored a
+        chunk at a time: each symptom column is validated and converted to
+        points in one pass, then the columns are summed together.
+        A row that fails validation yields {'row': i, 'error': ...}.
+        """
+        chunk = []
+        offset = 0
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield from self._score_chunk(chunk, offset)
+                offset += len(chunk)
+                chunk = []
+        if chunk:
+            yield from self._score_chunk(chunk, offset)
+
+    def _score_chunk(self, rows, offset):
+        errors = {i: "Row must be an object" for i, row in enumerate(rows) if not hasattr(row, 'get')}
+
+        def column(name, convert):
+            values = []
+            for i, row in enumerate(rows):
+                if i in errors:
+                    values.append(None)
+                    continue
+                try:
+                    values.append(convert(row[name]))
+                except KeyError:
+                    errors[i] = f"Missing field '{name}'"
+                    values.append(None)
+                except (TypeError, ValueError):
+                    errors[i] = f"Invalid value for '{name}'"
+                    values.append(None)
+            return values
+
+        heights = column('height', finite_float)
+        weights = column('weight', finite_float)
+        totals = [0.0] * len(rows)
+        for name, points in self._points.items():
+            for i, answer in enumerate(column(name, symptom_answer)):
+                if answer is None:
+                    continue
+                if answer not in (0, 1, 2):
+                    errors.setdefault(i, f"'{name}' must be 0, 1 or 2")
+                    continue
+                totals[i] += points[answer]
+
+        for i, row in enumerate(rows):
+            if i in errors:
+                row_id = row.get('id') if hasattr(row, 'get') else None
+                yield {'row': offset + i, 'id': row_id, 'error': errors[i]}
+                continue
+            if heights[i] <= 0 or weights[i] <= 0:
+                yield {'row': offset + i, 'id': row.get('id'), 'error': "Height and weight must be positive"}
+                continue
+            try:
+                bmi, bmi_cat, bmi_points = self.bmi(heights[i], weights[i])
+            except (ZeroDivisionError, OverflowError):
+                bmi = math.inf
+            if not math.isfinite(bmi):
+                yield {'row': offset + i, 'id': row.get('id'), 'error': "Height and weight give an invalid BMI"}
+                continue
+            score = totals[i] + bmi_points
+            percentage = int((score / self.max_score) * 100)
+            risk_class, result = self.risk(percentage)
+            yield {
+                'row': offset + i,
+                'id': row.get('id'),
+                'bmi': bmi,
+                'bmi_cat': bmi_cat,
+                'score': score,
+                'percentage': percentage,
+                'risk_class': risk_class,
+                'result': result,
+            }
+
+
+# Optional weight overrides, e.g. STREE_PCOS_WEIGHTS='{"acne": 1}'
+app.config['PCOS_WEIGHTS'] = json.loads(os.environ['STREE_PCOS_WEIGHTS']) if os.environ.get('STREE_PCOS_WEIGHTS') else None
+
+_pcos_scorer = None
+
+
+def get_pcos_scorer():
+    """
+    Returns the scorer for app.config['PCOS_WEIGHTS']. Read on each call, not
+    at import, so the config can be set after the app module is loaded; the
+    scorer is rebuilt only when the weights change.
+    """
+    global _pcos_scorer
+    weights = app.config.get('PCOS_WEIGHTS')
+    if _pcos_scorer is None or _pcos_scorer[0] != weights:
+        scorer = PCOSScorer(weights)
+        _pcos_scorer = (dict(weights) if weights is not None else None, scorer)
+    return _pcos_scorer[1]
+
 
 @app.route('/pcos', methods=['GET', 'POST'])
 def pcos():
@@ -350,55 +933,21 @@ def pcos():
         return redirect('/login')
 
     if request.method == 'POST':
-        # ---- New Metrics fields ----
-        age           = int(request.form['age'])
-        height_cm     = float(request.form['height'])
-        weight_kg     = float(request.form['weight'])
-        
-        # Calculate BMI
-        height_m = height_cm / 100
-        bmi = round(weight_kg / (height_m ** 2), 1)
-        
-        bmi_cat = "Normal"
-        bmi_score = 0
-        if bmi < 18.5:
-            bmi_cat = "Underweight"
-        elif 18.5 <= bmi < 25:
-            bmi_cat = "Healthy Weight"
-        elif 25 <= bmi < 30:
-            bmi_cat = "Overweight"
-            bmi_score = 1
-        else:
-            bmi_cat = "Obese"
-            bmi_score = 2
-
-        # ---- Symptom scores ----
-        # Weighting primary symptoms heavier
-        # Values from Form: 0=No, 1=Sometimes, 2=Yes
-        irregular     = int(request.form['irregular']) * 2      # 0, 2, 4
-        acne          = int(request.form['acne']) * 0.5         # 0, 0.5, 1
-        hair_growth   = int(request.form['hair_growth']) * 1.5  # 0, 1.5, 3
-        weight_gain   = int(request.form['weight_gain']) * 0.5  # 0, 0.5, 1
-        family_history= int(request.form['family_history'])     # 0, 1, 2
-
         # ---- Lifestyle fields ----
         living        = request.form['living']          # 'hostel' or 'home'
         exercise_time = request.form['exercise_time']   # minutes string
 
         # ---- Risk calculation ----
-        score     = irregular + acne + hair_growth + weight_gain + family_history + bmi_score
-        max_score = 13  # 4 + 1 + 3 + 1 + 2 + 2
-        percentage = int((score / max_score) * 100)
-
-        if percentage < 35:
-            result     = "Low Risk of PCOS / PCOD 🌿"
-            risk_class = "low"
-        elif 35 <= percentage < 65:
-            result     = "Moderate Risk of PCOS / PCOD ⚠️"
-            risk_class = "medium"
-        else:
-            result     = "High Risk of PCOS / PCOD 🚨 Please Consult a Doctor"
-            risk_class = "high"
+        # Values from Form: 0=No, 1=Sometimes, 2=Yes
+        scored = get_pcos_scorer().score(request.form)
+        if 'error' in scored:
+            return render_template('pcos.html', error=scored['error'])
+
+        result     = scored['result']
+        risk_class = scored['risk_class']
+        percentage = scored['percentage']
+        bmi        = scored['bmi']
+        bmi_cat    = scored['bmi_cat']
 
         # ---- Exercise plan ----
         exercises, tip = get_exercise_plan(risk_class, exercise_time, living)
@@ -436,31 +985,131 @@ def pcos():
     return render_template('pcos.html')
 
 
+# ------------------ PCOS BATCH API ------------------
+def _read_batch_rows():
+    """
+    Returns (rows, weights, as_csv) for a batch request. Accepts a JSON
+    list of rows, a JSON object {"rows": [...], "weights": {...}}, or CSV
+    (as the raw body or an uploaded 'file') with one participant per line.
+    """
+    upload = request.files.get('file')
+    if upload:
+        return csv.DictReader(io.StringIO(upload.read().decode('utf-8-sig'))), None, True
+
+    if request.mimetype in ('text/csv', 'application/csv'):
+        return csv.DictReader(io.StringIO(request.get_data(as_text=True))), None, True
+
+    payload = request.get_json(silent=True)
+    if isinstance(payload, list):
+        return payload, None, False
+    if isinstance(payload, dict) and isinstance(payload.get('rows'), list):
+        return payload['rows'], payload.get('weights'), False
+    raise ValueError("Send a JSON list of rows, {\"rows\": [...]}, or a CSV file.")
+
+
+@app.route('/api/pcos/score-batch', methods=['POST'])
+def pcos_score_batch():
+    if 'user' not in session:
+        return jsonify(error="Login required"), 401
+
+    try:
+        rows, weights, as_csv = _read_batch_rows()
+        scorer = PCOSScorer(weights) if weights is not None else get_pcos_scorer()
+    except (TypeError, ValueError) as e:
+        return jsonify(error=str(e)), 400
+
+    plan_urls = {}
+
+    def with_plans(result, row):
+        if 'error' in result:
+            return result
+        living = row.get('living') if row.get('living') in ('hostel', 'home') else 'home'
+        try:
+            minutes = min(EXERCISE_MINUTES, key=lambda k: abs(k - int(row.get('exercise_time') or 30)))
+        except (TypeError, ValueError):
+            minutes = 30
+        key = (result['risk_class'], living, minutes)
+        if key not in plan_urls:
+            plan_urls[key] = (
+                url_for('pcos_plan', plan='diet', risk_class=key[0], living=living),
+                url_for('pcos_plan', plan='exercise', risk_class=key[0], living=living, minutes=minutes),
+            )
+        result['diet_plan'], result['exercise_plan'] = plan_urls[key]
+        return result
+
+    def generate():
+        # Hold each row until its result comes back so plan pointers can use its lifestyle fields
+        pending = {}
+
+        def tee(source):
+            for i, row in enumerate(source):
+                pending[i] = row
+                yield row
+
+        fields = ['row', 'id', 'bmi', 'bmi_cat', 'score', 'percentage', 'risk_class',
+                  'result', 'diet_plan', 'exercise_plan', 'error']
+        if as_csv:
+            buf = io.StringIO()
+            writer = csv.DictWriter(buf, fieldnames=fields)
+            writer.writeheader()
+            yield buf.getvalue()
+
+        for result in scorer.score_batch(tee(rows)):
+            row = pending.pop(result['row'])
+            result = with_plans(result, row if isinstance(row, dict) else {})
+            if as_csv:
+                buf.seek(0)
+                buf.truncate()
+                writer.writerow(result)
+                yield buf.getvalue()
+            else:
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    mimetype = 'text/csv' if as_csv else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+@app.route('/api/pcos/plans/<plan>/<risk_class>')
+def pcos_plan(plan, risk_class):
+    if 'user' not in session:
+        return jsonify(error="Login required"), 401
+    if risk_class not in ('low', 'medium', 'high') or plan not in ('diet', 'exercise'):
+        return jsonify(error="Unknown plan"), 404
+
+    living = request.args.get('living', 'home')
+    if plan == 'diet':
+        meals, avoid, tip = get_diet_chart(risk_class, living)
+        return jsonify(risk_class=risk_class, living=living, meals=meals, avoid=avoid, tip=tip)
+
+    minutes = request.args.get('minutes', 30, type=int)
+    exercises, tip = get_exercise_plan(risk_class, minutes, living)
+    return jsonify(risk_class=risk_class, living=living, minutes=minutes, exercises=exercises, tip=tip)
+
+
 # ------------------ CYCLE TRACKER HELPERS ------------------
-def calculate_cycle_predictions(logs, pcos_risk_class):
+def calculate_cycle_predictions(history, pcos_risk_class):
     """
-    Takes a list of cycle logs (from oldest to newest) and calculates:
+    Takes a CycleHistory (or a list of CycleLog rows) and calculates:
     - Average cycle length
     - Next expected period date
     - Next fertile window
     - Red flags / alerts (e.g. >35 days indicates PCOS risk)
     - Current phase (approx based on days since last period)
     """
-    if not logs:
+    if not history:
         return None
 
-    # Sort logs by start date ascending just in case
-    logs = sorted(logs, key=lambda x: datetime.strptime(x[2], '%Y-%m-%d'))
-    
+    if not isinstance(history, CycleHistory):
+        history = CycleHistory(history)
+
     # Calculate average cycle length from valid previous cycle_lengths
-    cycle_lengths = [log[4] for log in logs if log[4] is not None and log[4] > 0]
+    cycle_lengths = history.valid_cycle_lengths()
     avg_cycle = sum(cycle_lengths) // len(cycle_lengths) if cycle_lengths else 28
-    
+
     # Get the most recent period start date
-    latest_start_str = logs[-1][2]
-    latest_start = datetime.strptime(latest_start_str, '%Y-%m-%d').date()
+    latest_start = history.latest_start()
     today = datetime.now().date()
-    
+
     # Predict next period start
     next_period_date = latest_start + timedelta(days=avg_cycle)
     days_to_next = (next_period_date - today).days
@@ -507,7 +1156,9 @@ def calculate_cycle_predictions(logs, pcos_risk_class):
         "days_to_next": days_to_next,
         "fertile_window": f"{fertile_start.strftime('%d %b')} - {fertile_end.strftime('%d %b')}",
         "current_phase": current_phase,
-        "alerts": alerts
+        "alerts": alerts,
+        "next_period_date": next_period_date,
+        "fertile_start_date": fertile_start,
     }
 
 def get_tracker_tips(living, current_phase):
@@ -570,6 +1221,428 @@ def get_tracker_tips(living, current_phase):
     return tips[phase].get(living, tips[phase]["home"])
 
 
+# ------------------ REMINDER SCHEDULER ------------------
+REMINDER_HOUR = 9               # reminders go out at 9 AM on their day
+PERIOD_REMINDER_DAYS_BEFORE = 2
+
+REMINDER_MESSAGES = {
+    "period": "Your next period is expected on {date}. Keep your essentials handy 🌸",
+    "fertile": "Your fertile window is predicted to start today ({date}).",
+}
+
+
+class LogReminderSink:
+    """
+    Delivers reminders by appending a line to a local file (and the app log).
+    Stand-in for a real push/email sink: any object with a
+    deliver(user_id, kind, event_date, message) method can be used instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def deliver(self, user_id, kind, event_date, message):
+        line = json.dumps({"user_id": user_id, "kind": kind,
+                           "event_date": event_date.isoformat(), "message": message})
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+        logging.getLogger(__name__).info("reminder %s", line)
+
+
+class ReminderScheduler:
+    """
+    Keeps each user's next reminders in a min-heap ordered by due time,
+    so the delivery loop only ever looks at the earliest one. Updating a
+    user replaces just their entries: superseded heap items are left in
+    place and skipped when popped.
+
+    The reminders table is the source of truth. Every worker process
+    writes to it through update_user(), but only the process holding the
+    scheduler's lock file runs the delivery loop. That loop merges in rows
+    due within the next `refresh_interval` seconds, so it also sees
+    reminders scheduled by other workers. Each reminder is claimed with a
+    DELETE before it is delivered, so it goes out at most once.
+    """
+
+    def __init__(self, sink, db_path="stree.db", refresh_interval=60):
+        self.sink = sink
+        self.db_path = db_path
+        self.refresh_interval = refresh_interval
+        self.start_attempted = False
+        self._heap = []
+        self._due = {}              # (user_id, kind) -> (due_at, event_date)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._lock_file = None
+        self._stopping = False
+
+    def start(self):
+        """
+        Loads pending reminders and starts the delivery loop, unless another
+        process using this database already runs it. Returns True if started.
+        """
+        self.start_attempted = True
+        if self._thread:
+            return True
+        if not self._acquire_process_lock():
+            return False
+        self._load()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._lock_file:
+            self._lock_file.close()     # closing the file releases the flock
+            self._lock_file = None
+
+    def _acquire_process_lock(self):
+        if fcntl is None:
+            return True     # no flock (Windows): assume the single-process dev server
+        lock_file = open(self.db_path + ".reminders.lock", 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _load(self, until=None):
+        """Merges rows from the reminders table (optionally only those due by `until`) into the heap."""
+        conn = sqlite3.connect(self.db_path)
+        if until is None:
+            rows = conn.execute("SELECT user_id, kind, due_at, event_date FROM reminders").fetchall()
+        else:
+            rows = conn.execute("SELECT user_id, kind, due_at, event_date FROM reminders WHERE due_at <= ?",
+                                (until.isoformat(),)).fetchall()
+        conn.close()
+        with self._cond:
+            for user_id, kind, due_at, event_date in rows:
+                entry = (datetime.fromisoformat(due_at), parse_date(event_date))
+                if self._due.get((user_id, kind)) != entry:
+                    self._due[(user_id, kind)] = entry
+                    heapq.heappush(self._heap, (entry[0], user_id, kind))
+
+    def update_user(self, user_id, predictions, now=None):
+        """
+        Reschedules one user's reminders from their latest cycle predictions.
+        Only the process running the delivery loop keeps them in memory;
+        every other worker just writes the reminders table.
+        """
+        now = now or datetime.now()
+        events = {}
+        if predictions:
+            events["period"] = predictions["next_period_date"]
+            events["fertile"] = predictions["fertile_start_date"]
+
+        conn = sqlite3.connect(self.db_path)
+        with self._cond:
+            owner = self._thread is not None
+            for kind in REMINDER_MESSAGES:
+                event_date = events.get(kind)
+                due_at = None
+                if event_date:
+                    notify_on = event_date
+                    if kind == "period":
+                        notify_on -= timedelta(days=PERIOD_REMINDER_DAYS_BEFORE)
+                    due_at = datetime.combine(notify_on, datetime.min.time()).replace(hour=REMINDER_HOUR)
+
+                if due_at is None or due_at <= now:
+                    if owner:
+                        self._due.pop((user_id, kind), None)
+                    conn.execute("DELETE FROM reminders WHERE user_id = ? AND kind = ?", (user_id, kind))
+                    continue
+
+                if owner:
+                    self._due[(user_id, kind)] = (due_at, event_date)
+                    heapq.heappush(self._heap, (due_at, user_id, kind))
+                conn.execute("""
+                    INSERT OR REPLACE INTO reminders (user_id, kind, due_at, event_date)
+                    VALUES (?, ?, ?, ?)
+                """, (user_id, kind, due_at.isoformat(), event_date.isoformat()))
+            conn.commit()
+            self._cond.notify()
+        conn.close()
+
+    def pending(self):
+        with self._cond:
+            return sorted((due_at, user_id, kind) for (user_id, kind), (due_at, _) in self._due.items())
+
+    def run_due(self, now=None):
+        """Delivers every reminder due at or before `now`. Returns how many were sent."""
+        now = now or datetime.now()
+        self._load(until=now)
+
+        candidates = []
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                due_at, user_id, kind = heapq.heappop(self._heap)
+                entry = self._due.get((user_id, kind))
+                if entry is None or entry[0] != due_at:
+                    continue    # superseded by a later update_user()
+                del self._due[(user_id, kind)]
+                candidates.append((user_id, kind, due_at, entry[1]))
+
+        if not candidates:
+            return 0
+
+        sent = 0
+        conn = sqlite3.connect(self.db_path)
+        for user_id, kind, due_at, event_date in candidates:
+            # Claim the row first: if it is gone or was rescheduled, someone else owns it now
+            claimed = conn.execute("DELETE FROM reminders WHERE user_id = ? AND kind = ? AND due_at = ?",
+                                   (user_id, kind, due_at.isoformat()))
+            conn.commit()
+            if claimed.rowcount != 1:
+                continue
+            message = REMINDER_MESSAGES[kind].format(date=event_date.strftime('%d %b %Y'))
+            try:
+                self.sink.deliver(user_id, kind, event_date, message)
+                sent += 1
+            except Exception:
+                logging.getLogger(__name__).exception("Reminder delivery failed for user %s", user_id)
+        conn.close()
+        return sent
+
+    def _run(self):
+        while True:
+            # Pick up reminders other workers scheduled for the near future
+            self._load(until=datetime.now() + timedelta(seconds=self.refresh_interval))
+            with self._cond:
+                if self._stopping:
+                    return
+                timeout = self.refresh_interval
+                if self._heap:
+                    timeout = min(max((self._heap[0][0] - datetime.now()).total_seconds(), 0), timeout)
+                if timeout > 0:
+                    self._cond.wait(timeout)
+                if self._stopping:
+                    return
+            try:
+                self.run_due()
+            except Exception:
+                logging.getLogger(__name__).exception("Reminder scheduler pass failed")
+
+
+app.config['REMINDERS_ENABLED'] = os.environ.get('STREE_REMINDERS', '1') != '0'
+
+reminder_scheduler = ReminderScheduler(
+    LogReminderSink(os.path.join(os.path.dirname(__file__), 'reminders.log'))
+)
+
+
+@app.before_request
+def start_reminder_scheduler():
+    # Started on the first request rather than at import, so each worker
+    # tries once after forking; the lock file lets only one of them win.
+    if app.config['REMINDERS_ENABLED'] and not reminder_scheduler.start_attempted:
+        reminder_scheduler.start()
+
+
+# ------------------ CYCLE LOG WRITES ------------------
+def build_cycle_log_entry(user_id, start_date, end_date, symptoms_list, client_id=None):
+    """
+    Validates a submitted log and returns the entry tuple insert_cycle_log() expects.
+    Raises ValueError for a missing date or one that isn't YYYY-MM-DD.
+    Dates are stored normalised so ORDER BY start_date stays chronological.
+    """
+    if not start_date:
+        raise ValueError("Start date is required.")
+    start_dt = parse_form_date(start_date)
+    end_dt = parse_form_date(end_date) if end_date else start_dt
+    period_length = (end_dt - start_dt).days + 1
+    symptoms = ", ".join(symptoms_list)
+    return (user_id, start_dt.isoformat(), end_dt.isoformat() if end_date else end_date,
+            period_length, symptoms, client_id)
+
+
+def insert_cycle_log(cursor, entry):
+    """
+    Inserts one validated tracker entry, deriving its cycle length from the user's previous log.
+    Entries carrying a client_id that is already stored (a re-sent offline entry) are skipped.
+    """
+    user_id, start_date, end_date, period_length, symptoms, client_id = entry
+
+    if client_id:
+        cursor.execute("SELECT 1 FROM cycle_logs WHERE user_id = ? AND client_id = ?", (user_id, client_id))
+        if cursor.fetchone():
+            return
+
+    # Calculate cycle length (from previous period start to this start)
+    cursor.execute("SELECT start_date FROM cycle_logs WHERE user_id = ? ORDER BY start_date DESC LIMIT 1", (user_id,))
+    last_log = cursor.fetchone()
+    cycle_length = None
+    if last_log:
+        last_start_dt = parse_date(last_log[0])
+        cycle_length = (parse_date(start_date) - last_start_dt).days
+        # Prevent negative cycles if logging back in time (simple safeguard)
+        if cycle_length < 0: cycle_length = None
+
+    cursor.execute("""
+        INSERT INTO cycle_logs (user_id, start_date, end_date, cycle_length, period_length, symptoms, client_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (user_id, start_date, end_date, cycle_length, period_length, symptoms, client_id))
+
+
+def refresh_reminders(conn, user_id):
+    if not app.config['REMINDERS_ENABLED']:
+        return
+    # Only this user's reminders change; everyone else's stay queued as-is
+    predictions = calculate_cycle_predictions(load_cycle_history(conn, user_id), "unknown")
+    reminder_scheduler.update_user(user_id, predictions)
+
+
+class PendingWrite:
+    __slots__ = ('entry', 'done', 'error')
+
+    def __init__(self, entry, wait):
+        self.entry = entry
+        self.done = threading.Event() if wait else None
+        self.error = None
+
+
+class CycleLogWriter:
+    """
+    Write-behind queue for tracker submissions. Requests enqueue validated
+    entries into a bounded queue; one writer thread drains whatever has
+    accumulated (up to max_batch) and commits it as a single transaction.
+
+    durability="commit"  - submit() returns once the entry's group is committed
+    durability="enqueue" - submit() returns as soon as the entry is queued
+    When the queue is full, submit() waits up to `timeout` seconds and then
+    raises queue.Full so the caller can push back on the client. A commit
+    that takes longer than `commit_timeout` raises TimeoutError; the entry
+    stays queued and is still written, so callers should not ask for a retry
+    unless the entry carries a client_id.
+    """
+
+    def __init__(self, db_path="stree.db", max_queue=1000, max_batch=200,
+                 durability="commit", timeout=2.0, commit_timeout=30.0):
+        if durability not in ("commit", "enqueue"):
+            raise ValueError("durability must be 'commit' or 'enqueue'")
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.durability = durability
+        self.timeout = timeout
+        self.commit_timeout = commit_timeout
+        self.commits = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="cycle-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Flushes everything queued so far, then stops the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def submit(self, entry, wait=None):
+        if wait is None:
+            wait = self.durability == "commit"
+        pending = PendingWrite(entry, wait)
+        self._queue.put(pending, timeout=self.timeout)
+        if pending.done:
+            if not pending.done.wait(self.commit_timeout):
+                raise TimeoutError("Cycle log was not committed in time")
+            if pending.error:
+                raise pending.error
+
+    def submit_many(self, entries):
+        """
+        Queues every entry before waiting, so they can share a group commit,
+        then waits for all of them whatever the durability setting. Returns
+        the PendingWrites; a failed entry has .error set instead of raising.
+        """
+        pendings = []
+        for entry in entries:
+            pending = PendingWrite(entry, True)
+            self._queue.put(pending, timeout=self.timeout)
+            pendings.append(pending)
+        deadline = time.monotonic() + self.commit_timeout
+        for pending in pendings:
+            if not pending.done.wait(max(deadline - time.monotonic(), 0)):
+                raise TimeoutError("Cycle logs were not committed in time")
+        return pendings
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path)
+        stopping = False
+        while not stopping:
+            group = [self._queue.get()]
+            while len(group) < self.max_batch:
+                try:
+                    group.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in group:
+                stopping = True
+                group = [p for p in group if p is not None]
+            if group:
+                self._commit_group(conn, group)
+        conn.close()
+
+    def _commit_group(self, conn, group):
+        """Commits one group. Never raises: every entry ends up committed or with .error set."""
+        cursor = conn.cursor()
+        try:
+            try:
+                for pending in group:
+                    insert_cycle_log(cursor, pending.entry)
+                conn.commit()
+                self.commits += 1
+            except Exception:
+                # One bad entry shouldn't sink the others: retry them one by one
+                conn.rollback()
+                for pending in group:
+                    try:
+                        insert_cycle_log(cursor, pending.entry)
+                        conn.commit()
+                        self.commits += 1
+                    except Exception as e:
+                        conn.rollback()
+                        pending.error = e
+                        logging.getLogger(__name__).exception("Could not save cycle log for user %s",
+                                                              pending.entry[0])
+
+            for user_id in {p.entry[0] for p in group if p.error is None}:
+                try:
+                    refresh_reminders(conn, user_id)
+                except Exception:
+                    logging.getLogger(__name__).exception("Could not refresh reminders for user %s", user_id)
+        except Exception as e:
+            # e.g. the rollback itself failed; fail whatever wasn't settled
+            logging.getLogger(__name__).exception("Cycle log group failed")
+            for pending in group:
+                if pending.error is None:
+                    pending.error = e
+        finally:
+            for pending in group:
+                if pending.done:
+                    pending.done.set()
+
+
+# Optional write-behind mode: STREE_TRACKER_WRITE_MODE=write-behind
+app.config['TRACKER_WRITE_MODE'] = os.environ.get('STREE_TRACKER_WRITE_MODE', 'sync')
+app.config['TRACKER_WRITE_DURABILITY'] = os.environ.get('STREE_TRACKER_WRITE_DURABILITY', 'commit')
+
+cycle_log_writer = None
+if app.config['TRACKER_WRITE_MODE'] == 'write-behind':
+    cycle_log_writer = CycleLogWriter(durability=app.config['TRACKER_WRITE_DURABILITY'])
+    cycle_log_writer.start()
+    # Entries acknowledged in "enqueue" mode must still reach the database on shutdown
+    atexit.register(cycle_log_writer.stop)
+
+
 # ------------------ CYCLE TRACKER ROUTES ------------------
 @app.route('/tracker', methods=['GET', 'POST'])
 def tracker():
@@ -582,49 +1655,51 @@ def tracker():
     cursor.execute("SELECT id FROM users WHERE email = ?", (user_email,))
     user_id = cursor.fetchone()[0]
 
+    error = None
     if request.method == 'POST':
         start_date = request.form.get('start_date')
         end_date = request.form.get('end_date')
         symptoms_list = request.form.getlist('symptoms')
-        symptoms = ", ".join(symptoms_list)
         living = request.form.get('living', 'home')
         
         # Save living situation in session for tips
         session['living'] = living
 
-        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        end_dt = datetime.strptime(end_date, '%Y-%m-%d') if end_date else start_dt
-        period_length = (end_dt - start_dt).days + 1
+        try:
+            entry = build_cycle_log_entry(user_id, start_date, end_date, symptoms_list,
+                                          request.form.get('client_id') or None)
+        except ValueError as e:
+            # Show the tracker again with the problem rather than failing the request
+            error = str(e)
+        else:
+            if cycle_log_writer:
+                conn.close()
+                try:
+                    cycle_log_writer.submit(entry)
+                except queue.Full:
+                    return "The tracker is busy right now. Please try again in a moment.", 503
+                except TimeoutError:
+                    # Still queued and will be written; asking for a retry would only log it twice
+                    return redirect('/tracker?saving=1')
+                return redirect('/tracker')
+
+            insert_cycle_log(cursor, entry)
+            conn.commit()
+            refresh_reminders(conn, user_id)
 
-        # Calculate cycle length (from previous period start to this start)
-        cursor.execute("SELECT start_date FROM cycle_logs WHERE user_id = ? ORDER BY start_date DESC LIMIT 1", (user_id,))
-        last_log = cursor.fetchone()
-        cycle_length = None
-        if last_log:
-            last_start_dt = datetime.strptime(last_log[0], '%Y-%m-%d')
-            cycle_length = (start_dt - last_start_dt).days
-            # Prevent negative cycles if logging back in time (simple safeguard)
-            if cycle_length < 0: cycle_length = None
+            conn.close()
+            return redirect('/tracker')
 
-        cursor.execute("""
-            INSERT INTO cycle_logs (user_id, start_date, end_date, cycle_length, period_length, symptoms)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (user_id, start_date, end_date, cycle_length, period_length, symptoms))
-        
-        conn.commit()
-        conn.close()
-        return redirect('/tracker')
+    # GET Request Processing (also re-shows the page after a rejected POST)
+    history = load_cycle_history(conn, user_id)
+    conn.close()
 
-    # GET Request Processing
-    cursor.execute("SELECT * FROM cycle_logs WHERE user_id = ? ORDER BY start_date ASC", (user_id,))
-    logs = cursor.fetchall()
-    
     # We need to know previous PCOS risk if any to pass to predictions. 
     # Since we didn't save PCOS risk to DB, we'll assume "unknown" unless we want to extend the schema.
     # For now, we'll pass "unknown"
     pcos_risk = "unknown"
     
-    predictions = calculate_cycle_predictions(logs, pcos_risk)
+    predictions = calculate_cycle_predictions(history, pcos_risk)
     
     # Get living situation from session, default to home
     living = session.get('living', 'home')
@@ -633,19 +1708,11 @@ def tracker():
     if predictions:
         tips = get_tracker_tips(living, predictions['current_phase'])
 
-    # Format data for Chart.js
-    chart_labels = []
-    chart_data = []
-    for log in logs[-6:]: # Last 6 cycles
-        if log[4]: # If cycle_length exists
-            dt = datetime.strptime(log[2], '%Y-%m-%d')
-            chart_labels.append(dt.strftime('%b'))
-            chart_data.append(log[4])
+    # Format data for Chart.js (last 6 cycles)
+    chart_labels, chart_data = history.chart_series(6)
 
-    conn.close()
-    
     # Reverse logs for displaying history (newest first)
-    history_logs = list(reversed(logs))
+    history_logs = history.newest_first()
 
     return render_template('tracker.html', 
                            logs=history_logs, 
@@ -653,7 +1720,107 @@ def tracker():
                            tips=tips,
                            living=living,
                            chart_labels=chart_labels,
-                           chart_data=chart_data)
+                           chart_data=chart_data,
+                           error=error,
+                           saving=bool(request.args.get('saving')),
+                           client_id=secrets.token_urlsafe(16))
+
+
+# ------------------ OFFLINE SYNC ------------------
+SYNC_MAX_ENTRIES = 100
+
+
+@app.route('/sw.js')
+def service_worker():
+    # Served from the root (not /static) so the worker's scope covers /tracker
+    response = app.send_static_file('sw.js')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/api/sync', methods=['GET', 'POST'])
+def sync():
+    """
+    Delta sync for the offline tracker. The client sends the last version it
+    has seen (`since`) plus any entries it queued while offline; the response
+    holds only the rows whose version is newer, and the new high-water mark.
+    """
+    if 'user' not in session:
+        return jsonify(error="Login required"), 401
+
+    payload = request.get_json(silent=True) if request.method == 'POST' else None
+    if not isinstance(payload, dict):
+        payload = {}
+    try:
+        since = int(payload.get('since', request.args.get('since', 0)))
+    except (TypeError, ValueError):
+        return jsonify(error="'since' must be an integer version"), 400
+
+    queued = payload.get('entries') or []
+    if not isinstance(queued, list) or len(queued) > SYNC_MAX_ENTRIES:
+        return jsonify(error=f"'entries' must be a list of at most {SYNC_MAX_ENTRIES} logs"), 400
+
+    conn = sqlite3.connect("stree.db")
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM users WHERE email = ?", (session['email'],))
+    user_id = cursor.fetchone()[0]
+
+    applied = []
+    rejected = []
+    entries = []
+    for item in queued:
+        client_id = item.get('client_id') if isinstance(item, dict) else None
+        try:
+            if not client_id:
+                raise ValueError("client_id is required.")
+            if item.get('user') not in (None, session['email']):
+                raise ValueError("Entry was logged by another account.")
+            symptoms = item.get('symptoms') or []
+            if isinstance(symptoms, str):
+                symptoms = [symptoms]
+            entries.append(build_cycle_log_entry(user_id, item.get('start_date'), item.get('end_date') or '',
+                                                 symptoms, str(client_id)))
+        except (AttributeError, TypeError, ValueError) as e:
+            rejected.append({"client_id": client_id, "error": str(e)})
+            continue
+        applied.append(client_id)
+
+    if entries:
+        # Oldest first so cycle lengths chain the same way as live submissions
+        entries.sort(key=lambda e: parse_date(e[1]))
+        if cycle_log_writer:
+            # Delta must include these rows, so wait for them to commit whatever the durability setting.
+            # Retrying after a 503 is safe: entries are deduplicated by client_id.
+            try:
+                pendings = cycle_log_writer.submit_many(entries)
+            except (queue.Full, TimeoutError):
+                conn.close()
+                return jsonify(error="The tracker is busy right now. Please try again in a moment."), 503
+            failed = {pending.entry[5] for pending in pendings if pending.error}
+            if failed:
+                rejected.extend({"client_id": c, "error": "Could not be saved."} for c in applied if str(c) in failed)
+                applied = [c for c in applied if str(c) not in failed]
+        else:
+            for entry in entries:
+                insert_cycle_log(cursor, entry)
+            conn.commit()
+            refresh_reminders(conn, user_id)
+
+    cursor.row_factory = cycle_log_factory
+    cursor.execute(f"""
+        SELECT {CYCLE_LOG_COLUMNS} FROM cycle_logs
+        WHERE user_id = ? AND version > ? ORDER BY version ASC
+    """, (user_id, since))
+    changed = cursor.fetchall()
+    conn.close()
+
+    version = changed[-1].version if changed else since
+    return jsonify(
+        version=version,
+        logs=[log.to_dict() for log in changed],
+        applied=applied,
+        rejected=rejected,
+    )
 
 
 
@@ -797,6 +1964,173 @@ def logout():
     return redirect('/login')
 
 
+# ------------------ REQUEST PROFILER ------------------
+# Opt-in only. Nothing below is installed unless STREE_PROFILE_TOKEN or
+# STREE_PROFILE_SAMPLE_RATE is set, so normal requests pay no cost.
+#   X-Stree-Profile: <token>          or  ?_profile=<token>
+#   X-Stree-Profile-Mode: sample|cprofile  or  ?_profile_mode=...
+#   X-Stree-Profile-Memory: 1         or  ?_profile_mem=1   (tracemalloc)
+class StackSampler:
+    """
+    Samples one thread's Python stack at a fixed interval and counts each
+    distinct stack. write() emits the collapsed-stack format
+    ("outer;inner;leaf count") read by speedscope and flamegraph.pl.
+    """
+
+    def __init__(self, thread_id, interval=0.002):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.counts.items():
+                f.write(f"{stack} {count}\n")
+
+
+PROFILE_NAME_UNSAFE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+class RequestProfiler:
+    """
+    WSGI middleware that profiles selected requests and writes the result to
+    `profile_dir`. A request is profiled when it carries the admin token (in
+    the X-Stree-Profile header or the _profile query flag) or is picked by
+    random sampling at `sample_rate`. Streaming responses are covered up to
+    the point the server closes them.
+    """
+
+    def __init__(self, wsgi_app, profile_dir, token=None, sample_rate=0.0):
+        self.wsgi_app = wsgi_app
+        self.profile_dir = profile_dir
+        self.token = token
+        self.sample_rate = sample_rate
+        self._tracemalloc_lock = threading.Lock()
+        os.makedirs(profile_dir, exist_ok=True)
+
+    def _options(self, environ):
+        """Returns (mode, track_memory) when this request should be profiled, else None."""
+        if self.token:
+            args = parse_qs(environ.get('QUERY_STRING', ''))
+            supplied = environ.get('HTTP_X_STREE_PROFILE') or args.get('_profile', [''])[0]
+            if supplied and secrets.compare_digest(supplied, self.token):
+                mode = environ.get('HTTP_X_STREE_PROFILE_MODE') or args.get('_profile_mode', ['sample'])[0]
+                memory = (environ.get('HTTP_X_STREE_PROFILE_MEMORY') or args.get('_profile_mem', [''])[0]) == '1'
+                return (mode if mode in ('sample', 'cprofile') else 'sample'), memory
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sample', False
+        return None
+
+    def __call__(self, environ, start_response):
+        options = self._options(environ)
+        if options is None:
+            return self.wsgi_app(environ, start_response)
+
+        mode, memory = options
+        # tracemalloc is process-wide: only one request may own it at a time
+        memory = memory and self._tracemalloc_lock.acquire(blocking=False)
+        if memory:
+            tracemalloc.start(25)
+
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another request is already under cProfile; sample this one instead
+                mode = 'sample'
+        if mode == 'sample':
+            profiler = StackSampler(threading.get_ident())
+            profiler.start()
+
+        started = time.perf_counter()
+        try:
+            body = self.wsgi_app(environ, start_response)
+        except Exception:
+            self._finish(environ, mode, profiler, memory, started)
+            raise
+        return ClosingIterator(body, lambda: self._finish(environ, mode, profiler, memory, started))
+
+    def _finish(self, environ, mode, profiler, memory, started):
+        """Stops profiling and saves the results. Never raises: this runs inside the response's close()."""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        snapshot = None
+        try:
+            if mode == 'cprofile':
+                profiler.disable()
+            else:
+                profiler.stop()
+            if memory:
+                snapshot = tracemalloc.take_snapshot()
+        finally:
+            if memory:
+                tracemalloc.stop()
+                self._tracemalloc_lock.release()
+
+        # PATH_INFO and the method come from the client: keep them short and filesystem-safe
+        method = PROFILE_NAME_UNSAFE.sub('_', environ.get('REQUEST_METHOD', 'GET'))[:10]
+        path = PROFILE_NAME_UNSAFE.sub('_', environ.get('PATH_INFO', '/').strip('/'))[:60] or 'root'
+        base = os.path.join(
+            self.profile_dir,
+            f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{method}-{path}-{elapsed_ms:.0f}ms",
+        )
+
+        try:
+            if mode == 'cprofile':
+                # Open with snakeviz, or convert with flameprof / gprof2dot for a flamegraph
+                profiler.dump_stats(base + ".prof")
+            else:
+                profiler.write(base + ".collapsed.txt")
+
+            if snapshot is not None:
+                with open(base + ".alloc.txt", 'w', encoding='utf-8') as f:
+                    for stat in snapshot.statistics('traceback')[:50]:
+                        f.write(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+                        for line in stat.traceback.format():
+                            f.write(line + "\n")
+                        f.write("\n")
+        except Exception:
+            logging.getLogger(__name__).exception("Could not save request profile to %s", base)
+            return
+
+        logging.getLogger(__name__).info("profiled %s %s in %.0f ms -> %s",
+                                         environ.get('REQUEST_METHOD'), environ.get('PATH_INFO'), elapsed_ms, base)
+
+
+app.config['PROFILE_TOKEN'] = os.environ.get('STREE_PROFILE_TOKEN')
+app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get('STREE_PROFILE_SAMPLE_RATE', 0))
+app.config['PROFILE_DIR'] = os.environ.get('STREE_PROFILE_DIR', os.path.join(os.path.dirname(__file__), 'profiles'))
+
+if app.config['PROFILE_TOKEN'] or app.config['PROFILE_SAMPLE_RATE'] > 0:
+    app.wsgi_app = RequestProfiler(
+        app.wsgi_app,
+        app.config['PROFILE_DIR'],
+        token=app.config['PROFILE_TOKEN'],
+        sample_rate=app.config['PROFILE_SAMPLE_RATE'],
+    )
+
+
 if __name__ == "__main__":
     app.run(debug=False, 
             host='0.0.0.0',
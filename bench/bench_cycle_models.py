@@ -0,0 +1,63 @@
+"""
+Micro-benchmark: cycle prediction + chart data for a long history, using the
+old positional-tuple code path vs. CycleLog / CycleHistory.
+
+    python bench/bench_cycle_models.py [n_logs] [runs]
+"""
+import os
+import random
+import sys
+import tempfile
+import timeit
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# Importing app initialises stree.db in the working directory; keep it off the real one
+os.chdir(tempfile.mkdtemp())
+os.environ.setdefault('STREE_REMINDERS', '0')
+
+import app  # noqa: E402
+
+
+def make_rows(n):
+    random.seed(42)
+    rows = []
+    start = date(1990, 1, 1)
+    for i in range(n):
+        cycle_length = random.randint(22, 40)
+        rows.append((i, 1, start.isoformat(), None, cycle_length, 5, "Acne"))
+        start += timedelta(days=cycle_length)
+    return rows
+
+
+def tuples_with_strptime(rows):
+    """What calculate_cycle_predictions() and tracker() did before CycleLog."""
+    logs = sorted(rows, key=lambda x: datetime.strptime(x[2], '%Y-%m-%d'))
+    cycle_lengths = [log[4] for log in logs if log[4] is not None and log[4] > 0]
+    datetime.strptime(logs[-1][2], '%Y-%m-%d').date()
+    for log in logs[-6:]:
+        if log[4]:
+            datetime.strptime(log[2], '%Y-%m-%d').strftime('%b')
+    return cycle_lengths
+
+
+def cycle_history(rows):
+    history = app.CycleHistory(app.cycle_log_factory(None, row) for row in rows)
+    app.calculate_cycle_predictions(history, "unknown")
+    return history.chart_series(6)
+
+
+def main():
+    n_logs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rows = make_rows(n_logs)
+
+    print(f"{n_logs}-log history, prediction + chart, {runs} runs")
+    for label, fn in [("tuples + repeated strptime", tuples_with_strptime),
+                      ("CycleLog + CycleHistory", cycle_history)]:
+        per_run = timeit.timeit(lambda: fn(rows), number=runs) / runs
+        print(f"  {label:<28} {per_run * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
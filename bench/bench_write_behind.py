@@ -0,0 +1,76 @@
+"""
+Benchmark: tracker log writes per second with one commit per request (sync)
+vs. the write-behind queue in each durability mode.
+
+    python bench/bench_write_behind.py [threads] [entries_per_thread]
+
+Runs against a throw-away stree.db in a temporary directory.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# Importing app initialises stree.db in the working directory; keep it off the real one
+os.chdir(tempfile.mkdtemp())
+os.environ.setdefault('STREE_REMINDERS', '0')
+
+import app  # noqa: E402
+
+
+def entries(user_id, count):
+    start = date(2000, 1, 1)
+    for i in range(count):
+        yield (user_id, (start + timedelta(days=30 * i)).isoformat(), '', 5, '', None)
+
+
+def run_threads(n_threads, per_thread, write, first_user):
+    def worker(user_id):
+        for entry in entries(user_id, per_thread):
+            write(entry)
+
+    threads = [threading.Thread(target=worker, args=(first_user + t,)) for t in range(n_threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return started
+
+
+def sync_write(entry):
+    """What tracker() does per POST without write-behind."""
+    conn = sqlite3.connect("stree.db", timeout=30)
+    app.insert_cycle_log(conn.cursor(), entry)
+    conn.commit()
+    app.refresh_reminders(conn, entry[0])
+    conn.close()
+
+
+def main():
+    n_threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    total = n_threads * per_thread
+    print(f"{n_threads} threads x {per_thread} entries, {os.getcwd()}/stree.db")
+
+    started = run_threads(n_threads, per_thread, sync_write, first_user=1000)
+    elapsed = time.perf_counter() - started
+    print(f"  {'sync, commit per request':<30} {total / elapsed:8.0f} entries/s {total / elapsed:8.0f} commits/s")
+
+    for i, durability in enumerate(("commit", "enqueue"), start=1):
+        writer = app.CycleLogWriter(durability=durability)
+        writer.start()
+        started = run_threads(n_threads, per_thread, writer.submit, first_user=1000 + 100 * i)
+        writer.stop()   # include the time to drain the queue
+        elapsed = time.perf_counter() - started
+        label = f"write-behind, ack on {durability}"
+        print(f"  {label:<30} {total / elapsed:8.0f} entries/s {writer.commits / elapsed:8.0f} commits/s"
+              f" ({writer.commits} commits)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+// STREE service worker: offline app shell + queued cycle logs + delta sync.
+const SHELL_CACHE = 'stree-shell-v2';
+const SHELL_URLS = ['/tracker', '/dashboard', '/tips'];
+const CDN_HOSTS = ['cdn.jsdelivr.net'];
+
+const DB_NAME = 'stree';
+const DB_VERSION = 1;
+
+// ------------------ INDEXEDDB HELPERS ------------------
+// Stores: outbox (entries logged while offline), logs (synced rows), meta (sync version)
+function openDb() {
+    return new Promise((resolve, reject) => {
+        const req = indexedDB.open(DB_NAME, DB_VERSION);
+        req.onupgradeneeded = () => {
+            const db = req.result;
+            db.createObjectStore('outbox', { keyPath: 'client_id' });
+            db.createObjectStore('logs', { keyPath: 'id' });
+            db.createObjectStore('meta');
+        };
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => reject(req.error);
+    });
+}
+
+async function tx(storeName, mode, fn) {
+    const db = await openDb();
+    return new Promise((resolve, reject) => {
+        const t = db.transaction(storeName, mode);
+        const result = fn(t.objectStore(storeName));
+        t.oncomplete = () => resolve(result && 'result' in result ? result.result : result);
+        t.onerror = () => reject(t.error);
+    });
+}
+
+const getAll = (store) => tx(store, 'readonly', (s) => s.getAll());
+const getMeta = (key) => tx('meta', 'readonly', (s) => s.get(key));
+
+// The page tells us whose tracker it is showing. Outbox entries are tagged with
+// that account, and a different account's synced rows are discarded.
+async function setUser(user) {
+    const previous = await getMeta('user');
+    if (previous === user) {
+        return;
+    }
+    await tx('logs', 'readwrite', (s) => s.clear());
+    await tx('meta', 'readwrite', (s) => { s.delete('version'); s.put(user, 'user'); });
+}
+
+async function clearUserData() {
+    await Promise.all(['outbox', 'logs', 'meta'].map((store) => tx(store, 'readwrite', (s) => s.clear())));
+    await caches.delete(SHELL_CACHE);
+}
+
+// ------------------ LIFECYCLE ------------------
+self.addEventListener('install', (event) => {
+    event.waitUntil(
+        caches.open(SHELL_CACHE)
+            .then((cache) => Promise.all(SHELL_URLS.map((url) => cache.add(url).catch(() => null))))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(
+        caches.keys()
+            .then((keys) => Promise.all(keys.filter((k) => k !== SHELL_CACHE).map((k) => caches.delete(k))))
+            .then(() => self.clients.claim())
+    );
+});
+
+// ------------------ FETCH ------------------
+self.addEventListener('fetch', (event) => {
+    const url = new URL(event.request.url);
+
+    if (url.origin === self.location.origin && url.pathname === '/logout') {
+        // Don't leave one user's cycle data behind for the next person on this device
+        event.waitUntil(clearUserData());
+        return;
+    }
+
+    if (event.request.method === 'POST' && url.origin === self.location.origin && url.pathname === '/tracker') {
+        event.respondWith(submitLog(event.request));
+        return;
+    }
+
+    if (event.request.method !== 'GET') {
+        return;
+    }
+
+    if (event.request.mode === 'navigate' && SHELL_URLS.includes(url.pathname)) {
+        event.respondWith(networkFirst(event.request));
+    } else if (CDN_HOSTS.includes(url.hostname)) {
+        event.respondWith(cacheFirst(event.request));
+    }
+});
+
+async function networkFirst(request) {
+    const cache = await caches.open(SHELL_CACHE);
+    try {
+        const response = await fetch(request);
+        if (response.ok && !response.redirected) {
+            cache.put(new URL(request.url).pathname, response.clone());
+        }
+        return response;
+    } catch (err) {
+        // Ignore the query so /tracker?queued=1 (after an offline submit) still gets the cached page
+        const cached = await cache.match(request, { ignoreSearch: true });
+        return cached || Response.error();
+    }
+}
+
+async function cacheFirst(request) {
+    const cache = await caches.open(SHELL_CACHE);
+    const cached = await cache.match(request);
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    cache.put(request, response.clone());
+    return response;
+}
+
+// Try the normal form POST; if the network is down, queue the entry and show the cached tracker.
+async function submitLog(request) {
+    const form = await request.clone().formData();
+    try {
+        return await fetch(request);
+    } catch (err) {
+        const user = (await getMeta('user')) || null;
+        await tx('outbox', 'readwrite', (s) => s.put({
+            // Reuse the form's id: if the POST did reach the server, the sync is deduplicated
+            client_id: form.get('client_id') || self.crypto.randomUUID(),
+            user,
+            start_date: form.get('start_date'),
+            end_date: form.get('end_date') || '',
+            symptoms: form.getAll('symptoms'),
+            queued_at: new Date().toISOString(),
+        }));
+        if (self.registration.sync) {
+            self.registration.sync.register('stree-sync').catch(() => null);
+        }
+        return Response.redirect('/tracker?queued=1', 303);
+    }
+}
+
+// ------------------ SYNC ------------------
+let syncing = null;
+
+async function syncNow() {
+    const user = await getMeta('user');
+    if (!user) {
+        throw new Error('no signed-in user known yet');
+    }
+    // Never push one account's offline entries into another account. The server
+    // also rejects entries whose `user` doesn't match the session.
+    const outbox = await getAll('outbox');
+    const entries = outbox.filter((entry) => entry.user === user);
+    const foreign = outbox.filter((entry) => entry.user !== user).map((entry) => entry.client_id);
+    await tx('outbox', 'readwrite', (s) => foreign.forEach((id) => s.delete(id)));
+    const since = (await getMeta('version')) || 0;
+
+    const response = await fetch('/api/sync', {
+        method: 'POST',
+        credentials: 'same-origin',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ since, entries }),
+    });
+    if (!response.ok) {
+        throw new Error(`sync failed: ${response.status}`);
+    }
+    const delta = await response.json();
+
+    // Rejected entries will never succeed, so drop them along with the applied ones
+    const done = delta.applied.concat(delta.rejected.map((r) => r.client_id));
+    await tx('outbox', 'readwrite', (s) => done.forEach((id) => s.delete(id)));
+    await tx('logs', 'readwrite', (s) => delta.logs.forEach((log) => s.put(log)));
+    await tx('meta', 'readwrite', (s) => s.put(delta.version, 'version'));
+
+    if (delta.logs.length) {
+        // Refresh the cached tracker page so offline views include the new rows
+        caches.open(SHELL_CACHE).then((cache) => cache.add('/tracker')).catch(() => null);
+    }
+    return { pending: (await getAll('outbox')).length, received: delta.logs.length };
+}
+
+function runSync() {
+    if (!syncing) {
+        syncing = syncNow().finally(() => { syncing = null; });
+    }
+    return syncing;
+}
+
+self.addEventListener('sync', (event) => {
+    if (event.tag === 'stree-sync') {
+        event.waitUntil(runSync());
+    }
+});
+
+// Pages ask for a sync when they load or come back online, and for the outbox size.
+self.addEventListener('message', (event) => {
+    const reply = (msg) => event.source && event.source.postMessage(msg);
+    const data = event.data || {};
+    if (data.type === 'sync') {
+        event.waitUntil(
+            setUser(data.user)
+                .then(runSync)
+                .then((result) => reply({ type: 'synced', ...result }))
+                .catch(() => getAll('outbox').then((o) => reply({ type: 'offline', pending: o.length })))
+        );
+    }
+});
@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# app.py opens stree.db relative to the working directory as soon as it is
+# imported; make sure that never touches the real database
+os.chdir(tempfile.mkdtemp())
+# Tests drive schedulers explicitly instead of via the first request
+os.environ['STREE_REMINDERS'] = '0'
+
+import app as stree  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh stree.db in a temporary working directory."""
+    monkeypatch.chdir(tmp_path)
+    stree.init_db()
+    return str(tmp_path / "stree.db")
+
+
+@pytest.fixture
+def client(db):
+    stree.app.config['TESTING'] = True
+    return stree.app.test_client()
+
+
+def login(client, email="user@example.com", password="secret"):
+    client.post('/signup', data=dict(name="Test", age=21, email=email, password=password))
+    return client.post('/login', data=dict(email=email, password=password))
+
+
+@pytest.fixture
+def logged_in(client):
+    login(client)
+    return client
@@ -0,0 +1,126 @@
+import queue
+import sqlite3
+import threading
+
+import pytest
+
+import app as stree
+
+
+def entry(user_id, start_date):
+    return (user_id, start_date, '', 5, '', None)
+
+
+def stored(db, user_id):
+    conn = sqlite3.connect(db)
+    rows = conn.execute("SELECT start_date, cycle_length FROM cycle_logs WHERE user_id = ? ORDER BY start_date",
+                        (user_id,)).fetchall()
+    conn.close()
+    return rows
+
+
+def test_queued_entries_are_committed_in_groups(db):
+    writer = stree.CycleLogWriter(db_path=db, durability="enqueue", max_batch=50)
+    for i in range(120):
+        writer.submit(entry(1, f"2020-{1 + i // 28:02d}-{1 + i % 28:02d}"))
+    writer.start()
+    writer.stop()
+
+    assert len(stored(db, 1)) == 120
+    assert writer.commits == 3      # 50 + 50 + 20
+
+
+def test_entries_for_one_user_chain_cycle_lengths(db):
+    writer = stree.CycleLogWriter(db_path=db, durability="enqueue")
+    for start in ("2025-01-01", "2025-01-29", "2025-03-01"):
+        writer.submit(entry(7, start))
+    writer.start()
+    writer.stop()
+
+    assert stored(db, 7) == [("2025-01-01", None), ("2025-01-29", 28), ("2025-03-01", 31)]
+
+
+def test_bad_entry_falls_back_to_one_commit_per_entry(db, monkeypatch):
+    real_insert = stree.insert_cycle_log
+
+    def insert(cursor, e):
+        if e[0] == 666:
+            raise RuntimeError("boom")
+        real_insert(cursor, e)
+
+    monkeypatch.setattr(stree, "insert_cycle_log", insert)
+    writer = stree.CycleLogWriter(db_path=db, durability="commit", commit_timeout=5)
+    writer.start()
+
+    errors = []
+
+    def submit(e):
+        try:
+            writer.submit(e)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=submit, args=(entry(u, "2025-01-01"),)) for u in (1, 666, 2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    writer.stop()
+
+    assert [type(e) for e in errors] == [RuntimeError]
+    assert stored(db, 1) and stored(db, 2) and not stored(db, 666)
+
+
+def test_full_queue_raises_queue_full(db):
+    writer = stree.CycleLogWriter(db_path=db, durability="enqueue", max_queue=1, timeout=0.01)
+    writer.submit(entry(1, "2025-01-01"))
+    with pytest.raises(queue.Full):
+        writer.submit(entry(1, "2025-02-01"))
+
+
+def test_commit_wait_times_out_instead_of_hanging(db):
+    writer = stree.CycleLogWriter(db_path=db, durability="commit", commit_timeout=0.05)
+    with pytest.raises(TimeoutError):
+        writer.submit(entry(1, "2025-01-01"))   # writer thread never started
+
+
+def test_tracker_returns_503_when_queue_is_full(logged_in, db, monkeypatch):
+    writer = stree.CycleLogWriter(db_path=db, durability="enqueue", max_queue=1, timeout=0.01)
+    writer.submit(entry(99, "2025-01-01"))
+    monkeypatch.setattr(stree, "cycle_log_writer", writer)
+
+    response = logged_in.post('/tracker', data=dict(start_date="2025-02-01", living='home'))
+    assert response.status_code == 503
+
+
+def test_submit_many_shares_one_group_commit(db):
+    writer = stree.CycleLogWriter(db_path=db, commit_timeout=5)
+    result = []
+    submitter = threading.Thread(
+        target=lambda: result.extend(writer.submit_many([entry(3, f"2025-0{m}-01") for m in range(1, 6)])))
+    submitter.start()
+    while writer._queue.qsize() < 5:     # everything is queued before any commit is awaited
+        submitter.join(0.01)
+    writer.start()
+    submitter.join(10)
+    writer.stop()
+    pendings = result
+
+    assert all(p.error is None for p in pendings)
+    assert len(stored(db, 3)) == 5
+    assert writer.commits == 1
+
+
+def test_tracker_timeout_says_saving_and_resend_is_not_duplicated(logged_in, db, monkeypatch):
+    writer = stree.CycleLogWriter(db_path=db, commit_timeout=0.05)   # thread not started yet
+    monkeypatch.setattr(stree, "cycle_log_writer", writer)
+    form = dict(start_date="2025-02-01", living='home', client_id="form-1")
+
+    response = logged_in.post('/tracker', data=form)
+    assert response.status_code == 302 and 'saving=1' in response.location
+    assert 'will appear here shortly' in logged_in.get(response.location).get_data(as_text=True)
+
+    logged_in.post('/tracker', data=form)    # the user submits again anyway
+    writer.start()
+    writer.stop()
+    assert len(stored(db, 1)) == 1
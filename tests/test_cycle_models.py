@@ -0,0 +1,32 @@
+import sqlite3
+
+import app as stree
+
+
+def test_legacy_unpadded_dates_are_normalised(db):
+    conn = sqlite3.connect(db)
+    conn.execute("INSERT INTO cycle_logs (user_id, start_date, end_date) VALUES (1, '2025-3-1', '2025-3-5')")
+    conn.execute("INSERT INTO cycle_logs (user_id, start_date, end_date) VALUES (1, '2025-04-02', '')")
+    conn.commit()
+    versions_before = dict(conn.execute("SELECT id, version FROM cycle_logs"))
+
+    stree.init_db()
+
+    rows = conn.execute("SELECT id, start_date, end_date, version FROM cycle_logs ORDER BY id").fetchall()
+    assert [(r[1], r[2]) for r in rows] == [("2025-03-01", "2025-03-05"), ("2025-04-02", "")]
+    assert rows[0][3] > max(versions_before.values())
+    assert rows[1][3] == versions_before[rows[1][0]]
+
+    history = stree.load_cycle_history(conn, 1)
+    assert [log.cycle_length for log in history.logs] == [None, None]
+    assert history.latest_start().isoformat() == "2025-04-02"
+
+
+def test_tracker_page_renders_after_migration(logged_in, db):
+    conn = sqlite3.connect(db)
+    user_id = conn.execute("SELECT id FROM users").fetchone()[0]
+    conn.execute("INSERT INTO cycle_logs (user_id, start_date, end_date, cycle_length) VALUES (?, '2025-3-1', '', 30)",
+                 (user_id,))
+    conn.commit()
+    stree.init_db()
+    assert logged_in.get('/tracker').status_code == 200
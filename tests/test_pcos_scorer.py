@@ -0,0 +1,112 @@
+import itertools
+import json
+
+import pytest
+
+import app as stree
+
+
+def old_pcos_formula(form):
+    """The scoring that used to be hard-coded in the /pcos route."""
+    height_m = float(form['height']) / 100
+    bmi = round(float(form['weight']) / (height_m ** 2), 1)
+    bmi_score = 0
+    if bmi < 18.5:
+        bmi_cat = "Underweight"
+    elif 18.5 <= bmi < 25:
+        bmi_cat = "Healthy Weight"
+    elif 25 <= bmi < 30:
+        bmi_cat = "Overweight"
+        bmi_score = 1
+    else:
+        bmi_cat = "Obese"
+        bmi_score = 2
+
+    score = (int(form['irregular']) * 2 + int(form['acne']) * 0.5 + int(form['hair_growth']) * 1.5
+             + int(form['weight_gain']) * 0.5 + int(form['family_history']) + bmi_score)
+    percentage = int((score / 13) * 100)
+    if percentage < 35:
+        risk_class = "low"
+    elif 35 <= percentage < 65:
+        risk_class = "medium"
+    else:
+        risk_class = "high"
+    return bmi, bmi_cat, percentage, risk_class
+
+
+def forms():
+    for answers in itertools.product((0, 1, 2), repeat=5):
+        for weight in (45, 60, 70, 85):
+            yield dict(zip(['irregular', 'acne', 'hair_growth', 'weight_gain', 'family_history'], answers),
+                       height="160", weight=str(weight))
+
+
+def test_scorer_matches_old_hard_coded_formula():
+    scorer = stree.PCOSScorer()
+    for form in forms():
+        result = scorer.score(form)
+        assert (result['bmi'], result['bmi_cat'], result['percentage'], result['risk_class']) == old_pcos_formula(form)
+
+
+def test_batch_matches_single_scoring():
+    rows = list(forms())
+    scorer = stree.PCOSScorer()
+    batch = list(scorer.score_batch(rows, chunk_size=37))
+    assert [r['row'] for r in batch] == list(range(len(rows)))
+    assert [r['percentage'] for r in batch] == [scorer.score(row)['percentage'] for row in rows]
+
+
+@pytest.mark.parametrize("weights", [
+    ["irregular"],
+    {"irregular": -50},
+    {"acne": float('inf')},
+    {"acne": "nan"},
+    {"acne": True},
+    {"unknown": 1},
+])
+def test_invalid_weights_are_rejected(weights):
+    with pytest.raises(ValueError):
+        stree.PCOSScorer(weights)
+
+
+@pytest.mark.parametrize("height", ["nan", "inf", "0", "abc"])
+def test_non_finite_measurements_are_row_errors(height):
+    row = dict(next(forms()), height=height)
+    assert 'error' in stree.PCOSScorer().score(row)
+
+
+def test_batch_api_rejects_bad_weights_with_400(logged_in):
+    row = next(forms())
+    for body in ('{"rows": [%s], "weights": ["irregular"]}' % json.dumps(row),
+                 '{"rows": [%s], "weights": {"acne": Infinity}}' % json.dumps(row)):
+        response = logged_in.post('/api/pcos/score-batch', data=body, content_type='application/json')
+        assert response.status_code == 400
+
+
+def test_batch_api_streams_valid_json(logged_in):
+    rows = [next(forms()), dict(next(forms()), height="nan")]
+    response = logged_in.post('/api/pcos/score-batch', json=rows)
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert results[0]['risk_class'] == 'low'
+    assert results[0]['diet_plan'].startswith('/api/pcos/plans/diet/low')
+    assert 'error' in results[1]
+
+
+@pytest.mark.parametrize("answer, ok", [
+    (1, True), ("1", True), (2.0, True), ("2.0", True),
+    (1.7, False), ("1.5", False), (True, False), (None, False), ("nan", False),
+])
+def test_symptom_answers_must_be_whole_numbers(answer, ok):
+    row = dict(next(forms()), acne=answer)
+    result = stree.PCOSScorer().score(row)
+    assert ('error' not in result) is ok
+
+
+def test_pcos_weights_config_is_read_per_request(logged_in, monkeypatch):
+    row = dict(next(forms()), acne="2")
+    before = stree.get_pcos_scorer().score(row)['score']
+    monkeypatch.setitem(stree.app.config, 'PCOS_WEIGHTS', {'acne': 3})
+    assert stree.get_pcos_scorer().score(row)['score'] == before - 1 + 6
+
+    response = logged_in.post('/api/pcos/score-batch', json=[row])
+    assert json.loads(response.get_data(as_text=True).splitlines()[0])['score'] == before + 5
@@ -0,0 +1,55 @@
+import os
+import tracemalloc
+
+from werkzeug.test import Client
+
+import app as stree
+
+
+def profiled_client(tmp_path, **kwargs):
+    profiler = stree.RequestProfiler(stree.app.wsgi_app, str(tmp_path / "profiles"), token="tok", **kwargs)
+    return Client(profiler), profiler
+
+
+def get(client, url):
+    response = client.get(url)
+    response.get_data()
+    response.close()
+    return response
+
+
+def test_profiler_is_not_installed_by_default():
+    assert not isinstance(stree.app.wsgi_app, stree.RequestProfiler)
+
+
+def test_requests_without_token_are_not_profiled(db, tmp_path):
+    client, profiler = profiled_client(tmp_path)
+    get(client, '/login?_profile=wrong')
+    assert os.listdir(profiler.profile_dir) == []
+
+
+def test_cprofile_and_memory_outputs_are_written(db, tmp_path):
+    client, profiler = profiled_client(tmp_path)
+    get(client, '/login?_profile=tok&_profile_mode=cprofile&_profile_mem=1')
+    suffixes = sorted(name.rsplit('-', 1)[1].split('.', 1)[1] for name in os.listdir(profiler.profile_dir))
+    assert suffixes == ["alloc.txt", "prof"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_long_paths_do_not_break_the_response_or_leak_tracemalloc(db, tmp_path):
+    client, profiler = profiled_client(tmp_path)
+    response = get(client, '/' + 'a' * 300 + '/../x?_profile=tok&_profile_mem=1')
+    assert response.status_code == 404
+    [name] = [n for n in os.listdir(profiler.profile_dir) if n.endswith('.alloc.txt')]
+    assert len(name) < 120 and '/' not in name
+    assert not tracemalloc.is_tracing()
+    assert profiler._tracemalloc_lock.acquire(blocking=False)
+
+
+def test_write_errors_are_logged_not_raised(db, tmp_path, caplog):
+    client, profiler = profiled_client(tmp_path)
+    profiler.profile_dir = str(tmp_path / "missing" / "dir")
+    response = get(client, '/login?_profile=tok&_profile_mem=1')
+    assert response.status_code == 200
+    assert "Could not save request profile" in caplog.text
+    assert not tracemalloc.is_tracing()
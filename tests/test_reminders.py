@@ -0,0 +1,138 @@
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import app as stree
+
+
+class ListSink:
+    def __init__(self):
+        self.delivered = []
+
+    def deliver(self, user_id, kind, event_date, message):
+        self.delivered.append((user_id, kind, event_date))
+
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+def predictions(next_period, fertile_start):
+    return {"next_period_date": next_period, "fertile_start_date": fertile_start}
+
+
+def stored(db):
+    conn = sqlite3.connect(db)
+    rows = conn.execute("SELECT due_at, user_id, kind FROM reminders ORDER BY due_at").fetchall()
+    conn.close()
+    return [(datetime.fromisoformat(due_at), user_id, kind) for due_at, user_id, kind in rows]
+
+
+def test_update_user_replaces_that_users_entries(db):
+    scheduler = stree.ReminderScheduler(ListSink(), db_path=db)
+    scheduler.update_user(1, predictions(date(2026, 3, 20), date(2026, 3, 5)), now=NOW)
+    scheduler.update_user(2, predictions(date(2026, 3, 25), date(2026, 3, 10)), now=NOW)
+    scheduler.update_user(1, predictions(date(2026, 3, 28), date(2026, 3, 13)), now=NOW)
+
+    assert stored(db) == [
+        (datetime(2026, 3, 10, 9), 2, "fertile"),
+        (datetime(2026, 3, 13, 9), 1, "fertile"),
+        (datetime(2026, 3, 23, 9), 2, "period"),
+        (datetime(2026, 3, 26, 9), 1, "period"),
+    ]
+
+
+def test_scheduler_without_the_loop_keeps_nothing_in_memory(db):
+    scheduler = stree.ReminderScheduler(ListSink(), db_path=db)
+    for user_id in range(50):
+        scheduler.update_user(user_id, predictions(date(2026, 3, 20), date(2026, 3, 5)), now=NOW)
+    assert scheduler.pending() == []
+    assert scheduler._heap == []
+    assert len(stored(db)) == 100
+
+
+def test_loop_owner_keeps_only_the_latest_entries(db):
+    scheduler = stree.ReminderScheduler(ListSink(), db_path=db, refresh_interval=3600)
+    assert scheduler.start()
+    try:
+        scheduler.update_user(1, predictions(date(2099, 3, 20), date(2099, 3, 5)), now=NOW)
+        scheduler.update_user(1, predictions(date(2099, 4, 20), date(2099, 4, 5)), now=NOW)
+        assert scheduler.pending() == [
+            (datetime(2099, 4, 5, 9), 1, "fertile"),
+            (datetime(2099, 4, 18, 9), 1, "period"),
+        ]
+        assert len(scheduler._heap) == 4   # superseded items stay until popped
+    finally:
+        scheduler.stop()
+
+
+def test_events_already_passed_are_dropped(db):
+    scheduler = stree.ReminderScheduler(ListSink(), db_path=db)
+    scheduler.update_user(1, predictions(date(2026, 3, 2), date(2026, 2, 20)), now=NOW)
+    assert stored(db) == []
+
+
+def test_run_due_skips_superseded_entries(db):
+    sink = ListSink()
+    scheduler = stree.ReminderScheduler(sink, db_path=db)
+    scheduler.update_user(1, predictions(date(2026, 3, 20), date(2026, 3, 5)), now=NOW)
+    scheduler._load()   # the first schedule is now in the heap
+    # New log pushes everything back; the old heap items are still in the heap
+    scheduler.update_user(1, predictions(date(2026, 4, 20), date(2026, 4, 5)), now=NOW)
+
+    assert scheduler.run_due(datetime(2026, 3, 31)) == 0
+    assert sink.delivered == []
+
+    assert scheduler.run_due(datetime(2026, 4, 30)) == 2
+    assert sink.delivered == [(1, "fertile", date(2026, 4, 5)), (1, "period", date(2026, 4, 20))]
+    assert scheduler.run_due(datetime(2026, 4, 30)) == 0
+
+
+def test_reminder_is_claimed_only_once_across_schedulers(db):
+    sink_a, sink_b = ListSink(), ListSink()
+    a = stree.ReminderScheduler(sink_a, db_path=db)
+    b = stree.ReminderScheduler(sink_b, db_path=db)
+    a.update_user(1, predictions(date(2026, 3, 20), date(2026, 3, 5)), now=NOW)
+    b._load()
+
+    later = datetime(2026, 4, 1)
+    assert a.run_due(later) + b.run_due(later) == 2
+    assert len(sink_a.delivered) + len(sink_b.delivered) == 2
+
+
+def test_pending_reminders_are_reloaded_on_start(db):
+    first = stree.ReminderScheduler(ListSink(), db_path=db)
+    first.update_user(1, predictions(date(2099, 3, 20), date(2099, 3, 5)), now=NOW)
+    expected = stored(db)
+
+    restarted = stree.ReminderScheduler(ListSink(), db_path=db)
+    assert restarted.start()
+    try:
+        assert restarted.pending() == expected
+    finally:
+        restarted.stop()
+
+
+def test_only_one_scheduler_runs_the_loop(db):
+    a = stree.ReminderScheduler(ListSink(), db_path=db)
+    b = stree.ReminderScheduler(ListSink(), db_path=db)
+    assert a.start()
+    try:
+        if stree.fcntl is not None:
+            assert not b.start()
+    finally:
+        a.stop()
+    assert b.start()
+    b.stop()
+
+
+def test_tracker_post_schedules_reminders(logged_in, db, monkeypatch):
+    monkeypatch.setitem(stree.app.config, 'REMINDERS_ENABLED', True)
+    monkeypatch.setattr(stree.reminder_scheduler, 'start_attempted', True)   # no loop thread in tests
+    today = date.today()
+    logged_in.post('/tracker', data=dict(start_date=(today - timedelta(days=3)).isoformat(), living='home'))
+    assert "period" in {kind for _, _, kind in stored(db)}
+
+
+def test_tracker_post_skips_reminders_when_disabled(logged_in, db):
+    today = date.today()
+    logged_in.post('/tracker', data=dict(start_date=(today - timedelta(days=3)).isoformat(), living='home'))
+    assert stored(db) == []
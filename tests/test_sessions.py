@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+import app as stree
+from conftest import login
+
+
+@pytest.fixture
+def interface(db, monkeypatch):
+    """A fresh session interface (empty cache, no cache trust window) on the test database."""
+    interface = stree.ServerSideSessionInterface(stree.SQLiteSessionStore(db), cache_ttl=0)
+    monkeypatch.setattr(stree.app, "session_interface", interface)
+    return interface
+
+
+def session_rows(db):
+    return sqlite3.connect(db).execute("SELECT id, data FROM sessions").fetchall()
+
+
+def test_cookie_holds_only_an_opaque_id(client, interface, db):
+    login(client)
+    sid = client.get_cookie('session').value
+    rows = session_rows(db)
+    assert [row[0] for row in rows] == [sid]
+    assert "user@example.com" in rows[0][1] and "user@example.com" not in sid
+
+
+def test_cookie_is_not_reissued_on_later_requests(client, interface):
+    login(client)
+    assert 'Set-Cookie' not in client.get('/tracker').headers
+    response = client.post('/tips', data=dict(feeling='', living_env='hostel'))
+    assert 'Set-Cookie' not in response.headers
+
+
+def test_login_rotates_the_session_id(client, interface, db):
+    client.post('/signup', data=dict(name="Test", age=21, email="user@example.com", password="secret"))
+    client.get('/login')
+    with client.session_transaction() as sess:
+        sess['living'] = 'hostel'
+    before = client.get_cookie('session').value
+
+    client.post('/login', data=dict(email="user@example.com", password="secret"))
+    after = client.get_cookie('session').value
+
+    assert after != before
+    assert [row[0] for row in session_rows(db)] == [after]
+
+
+def test_logout_deletes_the_session(client, interface, db):
+    login(client)
+    response = client.get('/logout')
+    assert session_rows(db) == []
+    assert 'session=;' in response.headers['Set-Cookie']
+    assert client.get('/tracker').headers['Location'] == '/login'
+
+
+def test_expired_sessions_are_dropped_when_read(client, interface, db):
+    login(client)
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE sessions SET expires_at = 0")
+    conn.commit()
+
+    assert client.get('/tracker').headers['Location'] == '/login'
+    assert session_rows(db) == []
+
+
+def test_unchanged_session_is_not_rewritten(client, interface, monkeypatch):
+    login(client)
+    client.post('/tips', data=dict(feeling='', living_env='hostel'))
+
+    saves = []
+    real_save = interface.store.save
+    monkeypatch.setattr(interface.store, "save", lambda *args: (saves.append(args), real_save(*args)))
+    interface.cache_ttl = 60
+    client.get('/tracker')      # fills the cache
+    client.post('/tips', data=dict(feeling='', living_env='hostel'))
+    assert saves == []
+    client.post('/tips', data=dict(feeling='', living_env='home'))
+    assert len(saves) == 1
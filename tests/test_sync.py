@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+import app as stree
+
+
+def sync(client, since=0, entries=()):
+    response = client.post('/api/sync', json=dict(since=since, entries=list(entries)))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_sync_requires_login(client):
+    assert client.get('/api/sync').status_code == 401
+
+
+def test_sync_returns_only_rows_newer_than_since(logged_in):
+    logged_in.post('/tracker', data=dict(start_date="2025-01-01", living='home'))
+    first = sync(logged_in)
+    assert [log['start_date'] for log in first['logs']] == ["2025-01-01"]
+
+    logged_in.post('/tracker', data=dict(start_date="2025-01-29", living='home'))
+    second = sync(logged_in, since=first['version'])
+    assert [log['start_date'] for log in second['logs']] == ["2025-01-29"]
+    assert second['version'] > first['version']
+
+    assert sync(logged_in, since=second['version'])['logs'] == []
+
+
+def test_same_client_id_is_inserted_once(logged_in, db):
+    entry = dict(client_id="abc", start_date="2025-02-01", symptoms=["Acne"])
+    first = sync(logged_in, entries=[entry])
+    again = sync(logged_in, since=first['version'], entries=[entry])
+
+    assert first['applied'] == ["abc"] and again['applied'] == ["abc"]
+    assert again['logs'] == []
+    count = sqlite3.connect(db).execute("SELECT COUNT(*) FROM cycle_logs WHERE client_id = 'abc'").fetchone()[0]
+    assert count == 1
+
+
+@pytest.mark.parametrize("bad_date", ["20250226", "2025-W14-1", "26/02/2025", ""])
+def test_only_plain_iso_dates_are_accepted(logged_in, bad_date):
+    result = sync(logged_in, entries=[dict(client_id="x", start_date=bad_date)])
+    assert result['applied'] == [] and result['rejected'][0]['client_id'] == "x"
+
+
+def test_queued_entries_are_stored_in_date_order(logged_in):
+    result = sync(logged_in, entries=[
+        dict(client_id="b", start_date="2025-04-20"),
+        dict(client_id="a", start_date="2025-3-31"),
+    ])
+    logs = {log['client_id']: log for log in result['logs']}
+    assert logs['a']['start_date'] == "2025-03-31"
+    assert logs['b']['cycle_length'] == 20
+
+
+def test_write_behind_sync_waits_for_the_whole_batch(logged_in, db, monkeypatch):
+    writer = stree.CycleLogWriter(db_path=db, commit_timeout=5)
+    writer.start()
+    monkeypatch.setattr(stree, "cycle_log_writer", writer)
+    try:
+        result = sync(logged_in, entries=[dict(client_id=f"c{m}", start_date=f"2025-0{m}-01") for m in range(1, 4)])
+    finally:
+        writer.stop()
+    assert result['applied'] == ["c1", "c2", "c3"]
+    assert [log['client_id'] for log in result['logs']] == ["c1", "c2", "c3"]
+
+
+def test_entries_from_another_account_are_rejected(logged_in):
+    result = sync(logged_in, entries=[dict(client_id="x", user="someone@else", start_date="2025-01-01")])
+    assert result['applied'] == [] and result['logs'] == []
+
+
+def test_tracker_form_rejects_non_iso_dates(logged_in, db):
+    response = logged_in.post('/tracker', data=dict(start_date="20250226", living='home'))
+    assert response.status_code == 200
+    assert "not a valid date in YYYY-MM-DD format" in response.get_data(as_text=True)
+    assert sqlite3.connect(db).execute("SELECT COUNT(*) FROM cycle_logs").fetchone()[0] == 0